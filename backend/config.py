@@ -1,29 +1,68 @@
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
+# Base paths
+_BASE_PATH = Path(__file__).parent.parent
+
+# Encoder threads: ENCODE_THREADS if set, otherwise every available core
+_env_threads = os.environ.get("ENCODE_THREADS")
+_ENCODE_THREADS = int(_env_threads) if _env_threads else (os.cpu_count() or 1)
+
+# OpenMP/MKL read these once, when torch and onnxruntime are first imported,
+# so they are exported here, before rag_pipeline is loaded
+os.environ.setdefault("OMP_NUM_THREADS", str(_ENCODE_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(_ENCODE_THREADS))
+
+# Set once the storage directories have been created
+_DIRS_READY = False
+
+def _ensure_dirs(*paths: Path):
+    """Create directories if they don't exist, at most once per process"""
+    global _DIRS_READY
+    if _DIRS_READY:
+        return
+    for path in paths:
+        os.makedirs(path, exist_ok=True)
+    _DIRS_READY = True
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    def __init__(self):
-        # Base paths
-        self.base_path = Path(__file__).parent.parent
-        self.documents_path = self.base_path / "backend" / "documents"
-        self.chroma_db_path = self.base_path / "chroma_db"
-        
-        # Create directories if they don't exist
-        self.documents_path.mkdir(parents=True, exist_ok=True)
-        self.chroma_db_path.mkdir(parents=True, exist_ok=True)
-        
-        # LiteLLM configuration
-        self.litellm_endpoint = os.getenv("LITELLM_ENDPOINT", "http://localhost:4000")
-        
-        # Model configuration
-        self.embedding_model = "sentence-transformers/all-MiniLM-L6-v2"
-        self.llm_model = "gpt-3.5-turbo"
-        
-        # ChromaDB settings
-        self.collection_name = "documents"
-        self.max_documents = 1000
-        
-        # Text processing settings
-        self.chunk_size = 1000
-        self.chunk_overlap = 200
-        self.max_context_length = 4000
\ No newline at end of file
+    base_path: Path = _BASE_PATH
+    documents_path: Path = _BASE_PATH / "backend" / "documents"
+    chroma_db_path: Path = _BASE_PATH / "chroma_db"
+    embedding_cache_path: Path = _BASE_PATH / "embedding_cache"
+
+    # LiteLLM configuration
+    litellm_endpoint: str = "http://localhost:4000"
+
+    # Model configuration
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_backend: str = "onnx"
+    embedding_model_file: str = "onnx/model_qint8_avx512_vnni.onnx"
+    embedding_batch_size: int = 256
+    encode_threads: int = _ENCODE_THREADS
+    ingest_batch_size: int = 1024
+    ingest_concurrency: int = 4
+    executor_workers: int = 8
+    llm_model: str = "gpt-3.5-turbo"
+
+    # ChromaDB settings
+    collection_name: str = "documents"
+    max_documents: int = 1000
+
+    # Text processing settings
+    chunk_size: int = 1000
+    chunk_overlap: int = 200
+    max_context_length: int = 4000
+
+    def __post_init__(self):
+        _ensure_dirs(self.documents_path, self.chroma_db_path)
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Resolve environment overrides once and return the shared Config"""
+    return Config(
+        litellm_endpoint=os.environ.get("LITELLM_ENDPOINT", "http://localhost:4000")
+    )
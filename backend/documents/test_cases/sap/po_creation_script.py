@@ -4,22 +4,103 @@ Test Case ID: SAP_PO_001
 Description: Automated test for creating purchase orders in SAP
 """
 
+import json
 import unittest
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.client_config import ClientConfig
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
 
+# CDP errors raised when a navigation replaces the page mid-evaluation
+_CONTEXT_LOST = ("Execution context was destroyed", "Cannot find context")
+
+def wait_for_id(driver, el_id, timeout=10):
+    """Wait for an element by ID with an in-page CDP promise instead of polling"""
+    end_time = time.monotonic() + timeout
+    while (remaining := end_time - time.monotonic()) > 0:
+        expression = f"""
+            new Promise(resolve => {{
+                const id = {json.dumps(el_id)};
+                if (document.getElementById(id)) return resolve(true);
+                const observer = new MutationObserver(() => {{
+                    if (document.getElementById(id)) {{
+                        observer.disconnect();
+                        clearTimeout(timer);
+                        resolve(true);
+                    }}
+                }});
+                const timer = setTimeout(() => {{
+                    observer.disconnect();
+                    resolve(false);
+                }}, {remaining * 1000:.0f});
+                observer.observe(document, {{childList: true, subtree: true}});
+            }})
+        """
+        try:
+            result = driver.execute("executeCdpCommand", {
+                "cmd": "Runtime.evaluate",
+                "params": {"expression": expression, "awaitPromise": True, "returnByValue": True},
+            })["value"]
+        except WebDriverException as e:
+            # A navigation destroyed the page the promise ran in; retry on the new one
+            if not any(marker in str(e) for marker in _CONTEXT_LOST):
+                raise
+            time.sleep(0.05)
+            continue
+        if result.get("result", {}).get("value"):
+            return driver.find_element(By.ID, el_id)
+        break
+    raise TimeoutException(f"Element #{el_id} not present after {timeout}s")
+
 class SAPPOCreationTest(unittest.TestCase):
     
+    @classmethod
+    def setUpClass(cls):
+        """Start one browser session shared by all tests in the class"""
+        # Talk to a local chromedriver over a pooled keep-alive connection
+        cls.service = Service()
+        cls.service.start()
+        # Stops chromedriver even if the session below fails to start
+        cls.addClassCleanup(cls.service.stop)
+        client_config = ClientConfig(
+            remote_server_addr=cls.service.service_url,
+            keep_alive=True,
+            init_args_for_pool_manager={
+                "init_args_for_pool_manager": {"maxsize": 20, "block": False}
+            },
+        )
+        cls.driver = webdriver.Remote(
+            command_executor=cls.service.service_url,
+            options=webdriver.ChromeOptions(),
+            client_config=client_config,
+        )
+        cls.driver.maximize_window()
+        cls.base_url = "https://sap-test-environment.com"
+        cls.username = "test_user"
+        cls.password = "test_password"
+
     def setUp(self):
-        """Setup test environment"""
-        self.driver = webdriver.Chrome()
-        self.driver.maximize_window()
-        self.base_url = "https://sap-test-environment.com"
-        self.username = "test_user"
-        self.password = "test_password"
+        """Reset browser state between tests"""
+        self.driver.delete_all_cookies()
+        self.driver.get(self.base_url)
+        
+    def fill_fields(self, values):
+        """Set several input values in a single WebDriver round trip"""
+        self.driver.execute_script(
+            """
+            for (const [id, value] of Object.entries(arguments[0])) {
+                const el = document.getElementById(id);
+                el.value = value;
+                el.dispatchEvent(new Event('input', {bubbles: true}));
+                el.dispatchEvent(new Event('change', {bubbles: true}));
+            }
+            """,
+            values,
+        )
         
     def test_create_purchase_order(self):
         """
@@ -33,11 +114,7 @@ class SAPPOCreationTest(unittest.TestCase):
         """
         
         # Step 1: Login to SAP
-        self.driver.get(self.base_url)
-        
-        username_field = WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.ID, "username"))
-        )
+        username_field = wait_for_id(self.driver, "username")
         username_field.send_keys(self.username)
         
         password_field = self.driver.find_element(By.ID, "password")
@@ -47,9 +124,7 @@ class SAPPOCreationTest(unittest.TestCase):
         login_button.click()
         
         # Step 2: Navigate to PO creation
-        WebDriverWait(self.driver, 15).until(
-            EC.presence_of_element_located((By.ID, "main-menu"))
-        )
+        wait_for_id(self.driver, "main-menu", timeout=15)
         
         # Navigate to MM module
         mm_menu = self.driver.find_element(By.XPATH, "//span[text()='Materials Management']")
@@ -66,41 +141,24 @@ class SAPPOCreationTest(unittest.TestCase):
         create_po.click()
         
         # Step 3: Fill mandatory fields
-        # Vendor field
-        vendor_field = WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.ID, "vendor-input"))
-        )
-        vendor_field.send_keys("VENDOR001")
-        
-        # Purchase Organization
-        porg_field = self.driver.find_element(By.ID, "porg-input")
-        porg_field.send_keys("1000")
-        
-        # Purchase Group
-        pgroup_field = self.driver.find_element(By.ID, "pgroup-input")
-        pgroup_field.send_keys("001")
-        
-        # Company Code
-        company_field = self.driver.find_element(By.ID, "company-input")
-        company_field.send_keys("1000")
+        wait_for_id(self.driver, "vendor-input")
+        self.fill_fields({
+            "vendor-input": "VENDOR001",   # Vendor
+            "porg-input": "1000",          # Purchase Organization
+            "pgroup-input": "001",         # Purchase Group
+            "company-input": "1000",       # Company Code
+        })
         
         # Add line item
         add_item_btn = self.driver.find_element(By.ID, "add-item-btn")
         add_item_btn.click()
         
-        # Material number
-        material_field = WebDriverWait(self.driver, 5).until(
-            EC.presence_of_element_located((By.ID, "material-input"))
-        )
-        material_field.send_keys("MAT001")
-        
-        # Quantity
-        qty_field = self.driver.find_element(By.ID, "quantity-input")
-        qty_field.send_keys("10")
-        
-        # Unit price
-        price_field = self.driver.find_element(By.ID, "price-input")
-        price_field.send_keys("100.00")
+        wait_for_id(self.driver, "material-input", timeout=5)
+        self.fill_fields({
+            "material-input": "MAT001",    # Material number
+            "quantity-input": "10",        # Quantity
+            "price-input": "100.00",       # Unit price
+        })
         
         # Step 4: Save the PO
         save_button = self.driver.find_element(By.ID, "save-btn")
@@ -122,9 +180,10 @@ class SAPPOCreationTest(unittest.TestCase):
         
         print(f"Purchase Order created successfully: {po_number}")
         
-    def tearDown(self):
-        """Clean up after test"""
-        self.driver.quit()
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after all tests"""
+        cls.driver.quit()
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -5,19 +5,33 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 class LoginTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.driver = webdriver.Chrome()
+
     def setUp(self):
-        self.driver = webdriver.Chrome()
+        self.driver.delete_all_cookies()
         self.driver.get("https://example.com/login")
         
+    def login(self, username, password):
+        """Fill credentials and submit the form in a single WebDriver round trip"""
+        self.driver.execute_script(
+            """
+            for (const [id, value] of [['username', arguments[0]], ['password', arguments[1]]]) {
+                const el = document.getElementById(id);
+                el.value = value;
+                el.dispatchEvent(new Event('input', {bubbles: true}));
+                el.dispatchEvent(new Event('change', {bubbles: true}));
+            }
+            document.getElementById('login-btn').click();
+            """,
+            username,
+            password,
+        )
+        
     def test_valid_login(self):
         """Test login with valid credentials"""
-        username_field = self.driver.find_element(By.ID, "username")
-        password_field = self.driver.find_element(By.ID, "password")
-        login_button = self.driver.find_element(By.ID, "login-btn")
-        
-        username_field.send_keys("testuser@example.com")
-        password_field.send_keys("password123")
-        login_button.click()
+        self.login("testuser@example.com", "password123")
         
         # Wait for redirect to dashboard
         WebDriverWait(self.driver, 10).until(
@@ -28,13 +42,7 @@ class LoginTest(unittest.TestCase):
         
     def test_invalid_login(self):
         """Test login with invalid credentials"""
-        username_field = self.driver.find_element(By.ID, "username")
-        password_field = self.driver.find_element(By.ID, "password")
-        login_button = self.driver.find_element(By.ID, "login-btn")
-        
-        username_field.send_keys("invalid@example.com")
-        password_field.send_keys("wrongpassword")
-        login_button.click()
+        self.login("invalid@example.com", "wrongpassword")
         
         # Wait for error message
         error_message = WebDriverWait(self.driver, 10).until(
@@ -43,8 +51,9 @@ class LoginTest(unittest.TestCase):
         
         self.assertTrue(error_message.is_displayed())
         
-    def tearDown(self):
-        self.driver.quit()
+    @classmethod
+    def tearDownClass(cls):
+        cls.driver.quit()
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
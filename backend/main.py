@@ -1,25 +1,58 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import hashlib
 import os
+from pathlib import Path
+import aiofiles
 import uvicorn
-from rag_pipeline import RAGPipeline
-from config import Config
+# config must be imported first: it exports the OpenMP/MKL thread counts torch reads on import
+from config import get_config
+from rag_pipeline import RAGPipeline, FALLBACK_ANSWERS
 
-app = FastAPI(title="Local AI RAG API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize and warm up the RAG pipeline on startup"""
+    await rag_pipeline.initialize()
+    await rag_pipeline.warmup()
+    yield
+    await rag_pipeline.close()
+
+app = FastAPI(
+    title="Local AI RAG API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:3000", "https://localhost:5173"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["content-type", "authorization"],
 )
 
+# Read uploads in 1 MiB pieces so memory stays bounded per request
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Answers for repeated chat prompts, keyed by a hash of the normalized prompt
+CHAT_CACHE_SIZE = 1024
+_chat_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+# Bumped on every invalidation so results computed before it are not stored
+_cache_generation = 0
+
+# Last /documents result, tagged with the documents directory mtime it was built at
+_docs_cache: Optional[tuple] = None
+
 # Initialize RAG pipeline
-config = Config()
+config = get_config()
 rag_pipeline = RAGPipeline(config)
 
 class ChatRequest(BaseModel):
@@ -54,10 +87,35 @@ class ExecutionResponse(BaseModel):
     stderr: str
     return_code: int
     execution_time: str
-@app.on_startup
-async def startup_event():
-    """Initialize the RAG pipeline on startup"""
-    await rag_pipeline.initialize()
+
+def _chat_cache_key(message: str, context: Optional[str]) -> str:
+    """Hash whitespace- and case-normalized prompt text into a fixed-size key"""
+    normalized = " ".join(message.split()).lower() + "\0" + (context or "")
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+async def _cached_query(message: str, context: Optional[str]) -> dict:
+    """Answer a chat prompt, reusing the result of an identical earlier prompt"""
+    key = _chat_cache_key(message, context)
+    if key in _chat_cache:
+        _chat_cache.move_to_end(key)
+        return _chat_cache[key]
+    
+    generation = _cache_generation
+    response = await rag_pipeline.process_query(query=message, context=context)
+    
+    # Don't pin transient failures, or answers from before an upload/delete, in the cache
+    if response["answer"] not in FALLBACK_ANSWERS and generation == _cache_generation:
+        _chat_cache[key] = response
+        if len(_chat_cache) > CHAT_CACHE_SIZE:
+            _chat_cache.popitem(last=False)
+    return response
+
+def _invalidate_caches():
+    """Drop cached answers and listings after the document set changes"""
+    global _docs_cache, _cache_generation
+    _cache_generation += 1
+    _chat_cache.clear()
+    _docs_cache = None
 
 @app.get("/")
 async def root():
@@ -67,10 +125,7 @@ async def root():
 async def chat(request: ChatRequest):
     """Process chat request with RAG context"""
     try:
-        response = await rag_pipeline.process_query(
-            query=request.message,
-            context=request.context
-        )
+        response = await _cached_query(request.message, request.context)
         return ChatResponse(
             response=response["answer"],
             sources=response.get("sources", []),
@@ -83,20 +138,26 @@ async def chat(request: ChatRequest):
 @app.post("/upload-document")
 async def upload_document(file: UploadFile = File(...)):
     """Upload and process document for RAG"""
+    # Keep only the base name to block path traversal; reject names that leave nothing to save
+    safe_name = Path(file.filename or "").name
+    if safe_name in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail="Invalid filename")
+    
     try:
         # Save uploaded file
-        file_path = os.path.join(config.documents_path, file.filename)
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        file_path = config.documents_path / safe_name
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await buffer.write(chunk)
         
         # Process document
-        success = await rag_pipeline.add_document(file_path)
+        success = await rag_pipeline.add_document(str(file_path))
+        _invalidate_caches()
         
         if success:
             return {
-                "message": f"Document {file.filename} uploaded and processed successfully",
-                "filename": file.filename,
+                "message": f"Document {safe_name} uploaded and processed successfully",
+                "filename": safe_name,
                 "processed": True
             }
         else:
@@ -108,8 +169,18 @@ async def upload_document(file: UploadFile = File(...)):
 @app.get("/documents", response_model=List[DocumentInfo])
 async def list_documents():
     """List all processed documents"""
+    global _docs_cache
     try:
+        mtime = os.stat(config.documents_path).st_mtime_ns
+        if _docs_cache and _docs_cache[0] == mtime:
+            return _docs_cache[1]
+        generation = _cache_generation
         documents = await rag_pipeline.list_documents()
+        
+        # An empty list may be the pipeline's error fallback, and listing nothing is cheap anyway;
+        # also skip storing if an upload/delete invalidated the cache during the await
+        if documents and generation == _cache_generation:
+            _docs_cache = (mtime, documents)
         return documents
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -143,6 +214,7 @@ async def delete_document(filename: str):
     """Delete a document from the system"""
     try:
         success = await rag_pipeline.delete_document(filename)
+        _invalidate_caches()
         if success:
             return {"message": f"Document {filename} deleted successfully"}
         else:
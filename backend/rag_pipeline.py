@@ -1,35 +1,78 @@
 import os
 import asyncio
+import functools
+from contextlib import suppress
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 import chromadb
 from chromadb.config import Settings
-import requests
+import httpx
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.document_loaders import PyPDFLoader, TextLoader, UnstructuredWordDocumentLoader
-from langchain.embeddings import HuggingFaceEmbeddings
-import json
+from sentence_transformers import SentenceTransformer
+import onnxruntime
+import torch
+import numpy as np
+import diskcache
+import hashlib
 from pathlib import Path
 import ast
-import subprocess
-import tempfile
-from difflib import SequenceMatcher
+import io
+import tokenize
+import sys
+import aiofiles
+import aiofiles.os
+import aiofiles.tempfile
+
+# Canned answers returned when retrieval or the LLM call fails
+QUERY_ERROR_ANSWER = "I apologize, but I encountered an error processing your request."
+LLM_UNAVAILABLE_ANSWER = "I'm having trouble accessing the AI model right now. Please try again later."
+LLM_ERROR_ANSWER = "I encountered an error while generating a response."
+FALLBACK_ANSWERS = frozenset({QUERY_ERROR_ANSWER, LLM_UNAVAILABLE_ANSWER, LLM_ERROR_ANSWER})
+
+# Document loader per file extension; anything else is read as plain text
+LOADERS = {
+    '.pdf': PyPDFLoader,
+    '.txt': TextLoader,
+    '.md': TextLoader,
+    '.py': TextLoader,
+    '.docx': UnstructuredWordDocumentLoader,
+    '.doc': UnstructuredWordDocumentLoader
+}
+
+def _quantize(vector: np.ndarray):
+    """Scalar-quantize a float vector to int8 with a per-vector scale"""
+    scale = float(np.abs(vector).max()) or 1.0
+    return scale, np.round(vector / scale * 127).astype(np.int8)
+
+def _dequantize(scale: float, quantized: np.ndarray) -> np.ndarray:
+    """Restore an approximate float32 vector from its int8 form"""
+    return quantized.astype(np.float32) * (scale / 127)
 
 class RAGPipeline:
     def __init__(self, config):
         self.config = config
         self.client = None
         self.collection = None
-        self.embeddings = None
+        self.st_model = None
+        self.embedding_cache = None
+        self.http = None
+        self._pool = None
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len
+            chunk_size=config.chunk_size,
+            chunk_overlap=config.chunk_overlap,
+            length_function=len,
+            is_separator_regex=False
         )
-        self.python_files = {}  # Store Python file contents for analysis
+        self.python_files = {}  # Store Python file structure summaries for test generation
+        self._known_sources: Dict[str, None] = {}  # indexed source filenames, in ingest order
         
     async def initialize(self):
         """Initialize ChromaDB and embeddings"""
         try:
+            # Worker threads for blocking model, ChromaDB and filesystem calls
+            self._pool = ThreadPoolExecutor(max_workers=self.config.executor_workers)
+            
             # Initialize ChromaDB
             self.client = chromadb.PersistentClient(
                 path=self.config.chroma_db_path,
@@ -42,98 +85,319 @@ class RAGPipeline:
                 metadata={"hnsw:space": "cosine"}
             )
             
-            # Initialize embeddings
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
+            # Index known sources once so listing never scans the collection
+            self._known_sources = self._load_known_sources()
+            
+            # Pin encoder thread counts before the model is loaded
+            threads = self._configure_threads()
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = threads
+            session_options.inter_op_num_threads = 1
+            
+            # Initialize embeddings on the int8-quantized ONNX runtime
+            self.st_model = SentenceTransformer(
+                self.config.embedding_model,
+                backend=self.config.embedding_backend,
+                model_kwargs={
+                    "file_name": self.config.embedding_model_file,
+                    "provider": "CPUExecutionProvider",
+                    "session_options": session_options
+                }
+            )
+            
+            # Shared keep-alive client for LiteLLM calls
+            self.http = httpx.AsyncClient(
+                base_url=self.config.litellm_endpoint,
+                headers={"Content-Type": "application/json"},
+                timeout=60.0,
+                limits=httpx.Limits(max_keepalive_connections=32)
             )
             
+            # Persistent embedding cache keyed by model id + content hash
+            self.embedding_cache = diskcache.Cache(str(self.config.embedding_cache_path))
+            
             print("RAG Pipeline initialized successfully")
             
         except Exception as e:
             print(f"Error initializing RAG pipeline: {e}")
             raise
     
+    def _configure_threads(self) -> int:
+        """Set torch thread counts from config"""
+        threads = self.config.encode_threads
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Can only be set once per process, before any inter-op work has started
+            pass
+        return threads
+    
+    async def close(self):
+        """Release network connections, worker threads and the embedding cache held by the pipeline"""
+        if self.http is not None:
+            await self.http.aclose()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+    
+    async def _run_blocking(self, fn, *args, **kwargs):
+        """Run a blocking call on the pipeline's thread pool without stalling the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+    
+    async def warmup(self):
+        """Run one embedding and one search so the first request doesn't pay load costs"""
+        try:
+            embedding = await self._run_blocking(self.embed_query, "warmup")
+            if await self._run_blocking(self.collection.count) > 0:
+                await self._run_blocking(
+                    self.collection.query,
+                    query_embeddings=[embedding],
+                    n_results=1,
+                    include=["distances"]
+                )
+            print("RAG Pipeline warmed up")
+        except Exception as e:
+            print(f"Error warming up RAG pipeline: {e}")
+    
     async def add_document(self, file_path: str) -> bool:
         """Process and add document to vector store"""
         try:
             print(f"Processing document: {file_path}")
             
-            # Load document based on file type
             loader = self._get_document_loader(file_path)
-            documents = loader.load()
+            source = os.path.basename(file_path)
+            is_python = file_path.endswith('.py')
+            file_type = "python" if is_python else "document"
+            batch_size = self.config.ingest_batch_size
+            
+            # Chunks already stored for this file; unchanged ones are skipped
+            existing_data = await self._run_blocking(self.collection.get, where={"source": source}, include=[])
+            existing = set(existing_data['ids'])
+            seen = {}  # chunk ids in document order, also dedups repeated chunks
+            python_pages = []
+            page_count = 0
+            
+            async def chunk_batches():
+                """Stream pages from the loader, split them and yield new chunks in batches"""
+                nonlocal page_count
+                pages = self._lazy_pages(loader)
+                texts, metadatas, ids = [], [], []
+                
+                # Load and split one page at a time, off the event loop
+                while (item := await self._run_blocking(self._next_page_chunks, pages)) is not None:
+                    page, page_chunks = item
+                    page_count += 1
+                    if is_python:
+                        python_pages.append(page)
+                    
+                    for text in page_chunks:
+                        # Key chunks by content hash so re-ingesting unchanged text is a no-op
+                        content_hash = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+                        chunk_id = f"{source}_{content_hash}"
+                        if chunk_id in seen:
+                            continue
+                        seen[chunk_id] = None
+                        if chunk_id in existing:
+                            continue
+                        
+                        metadata = {
+                            "source": source,
+                            "chunk_id": len(seen) - 1,
+                            "file_path": file_path,
+                            "file_type": file_type,
+                            "content_hash": content_hash
+                        }
+                        if "page" in page.metadata:
+                            metadata["page"] = page.metadata["page"]
+                        texts.append(text)
+                        metadatas.append(metadata)
+                        ids.append(chunk_id)
+                        
+                        if len(texts) >= batch_size:
+                            yield texts, metadatas, ids
+                            texts, metadatas, ids = [], [], []
+                if texts:
+                    yield texts, metadatas, ids
+            
+            # Embed and upsert to ChromaDB while later pages are still loading
+            await self._index_chunks(chunk_batches())
+            print(f"Loaded {page_count} document sections into {len(seen)} chunks")
             
             # Special handling for Python files
-            if file_path.endswith('.py'):
-                await self._process_python_file(file_path, documents)
-            print(f"Loaded {len(documents)} document sections")
-            
-            # Split documents into chunks
-            chunks = self.text_splitter.split_documents(documents)
-            
-            print(f"Split into {len(chunks)} chunks")
-            
-            # Create embeddings and add to ChromaDB
-            for i, chunk in enumerate(chunks):
-                embedding = self.embeddings.embed_query(chunk.page_content)
-                
-                self.collection.add(
-                    embeddings=[embedding],
-                    documents=[chunk.page_content],
-                    metadatas=[{
-                        "source": os.path.basename(file_path),
-                        "chunk_id": i,
-                        "file_path": file_path,
-                        "file_type": "python" if file_path.endswith('.py') else "document"
-                    }],
-                    ids=[f"{os.path.basename(file_path)}_{i}"]
-                )
+            if is_python:
+                await self._process_python_file(file_path, python_pages)
+            
+            # Drop chunks from a previous version of this file
+            stale = list(existing.difference(seen))
+            if stale:
+                await self._run_blocking(self.collection.delete, ids=stale)
+            if seen:
+                self._known_sources[source] = None
+            else:
+                # Nothing left to index; stop listing the file or offering its structure
+                self._known_sources.pop(source, None)
+                self.python_files.pop(source, None)
             
-            print(f"Successfully processed and indexed {os.path.basename(file_path)}")
+            print(f"Successfully processed and indexed {source}")
             return True
             
         except Exception as e:
             print(f"Error processing document {file_path}: {e}")
             return False
     
+    async def add_documents(self, file_paths: List[str]) -> List[bool]:
+        """Process and add several documents, overlapping their loading and indexing"""
+        semaphore = asyncio.Semaphore(self.config.ingest_concurrency)
+        
+        async def add_one(file_path: str) -> bool:
+            async with semaphore:
+                return await self.add_document(file_path)
+        
+        return await asyncio.gather(*[add_one(file_path) for file_path in file_paths])
+    
+    async def _index_chunks(self, batches):
+        """Embed batch N+1 while batch N is being upserted into ChromaDB"""
+        queue = asyncio.Queue(maxsize=2)
+        
+        async def produce():
+            try:
+                async for texts, metadatas, ids in batches:
+                    embeddings = await self._run_blocking(self.embed_documents, texts)
+                    await queue.put((texts, metadatas, ids, embeddings))
+            except asyncio.CancelledError:
+                # The consumer failed and no longer drains the queue; don't wait for room
+                raise
+            except BaseException:
+                await queue.put(None)
+                raise
+            else:
+                await queue.put(None)
+            finally:
+                # Release the loader's file handle even when iteration stops early
+                await batches.aclose()
+        
+        async def consume():
+            while (item := await queue.get()) is not None:
+                texts, metadatas, ids, embeddings = item
+                await self._run_blocking(
+                    self.collection.upsert,
+                    embeddings=embeddings,
+                    documents=texts,
+                    metadatas=metadatas,
+                    ids=ids
+                )
+        
+        producer = asyncio.create_task(produce())
+        try:
+            await consume()
+        except BaseException:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            raise
+        await producer
+    
+    @staticmethod
+    def _lazy_pages(loader):
+        """Iterate a loader's pages lazily, falling back to load() for loaders without lazy_load()"""
+        try:
+            yield from loader.lazy_load()
+        except NotImplementedError:
+            yield from loader.load()
+    
+    def _next_page_chunks(self, pages):
+        """Read the next page and split it, or return None when the loader is exhausted"""
+        page = next(pages, None)
+        if page is None:
+            return None
+        text = page.page_content
+        
+        # A page that already fits in one chunk needs no splitting
+        if len(text) <= self.config.chunk_size:
+            text = text.strip()
+            return page, [text] if text else []
+        return page, self.text_splitter.split_text(text)
+    
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode texts, reusing cached vectors and only running the model on misses"""
+        model_id = f"{self.config.embedding_model}/{self.config.embedding_model_file}".encode()
+        keys = [model_id + hashlib.blake2b(t.encode(), digest_size=16).digest() for t in texts]
+        cached = [self.embedding_cache.get(key) for key in keys]
+        cached = [None if entry is None else _dequantize(*entry) for entry in cached]
+        
+        miss_idx = [i for i, vector in enumerate(cached) if vector is None]
+        if miss_idx:
+            encoded = self._encode_sorted([texts[i] for i in miss_idx])
+            for i, vector in zip(miss_idx, encoded):
+                # Return the same int8-rounded vector a later cache hit would
+                entry = _quantize(vector)
+                self.embedding_cache.set(keys[i], entry)
+                cached[i] = _dequantize(*entry)
+        
+        return np.stack(cached)
+    
+    def _encode_sorted(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in length-sorted batches to minimize padding, returning rows in input order"""
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        embeddings = self.st_model.encode(
+            [texts[i] for i in order],
+            batch_size=self.config.embedding_batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True
+        )
+        return embeddings[np.argsort(order)].astype(np.float32)
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query string"""
+        return self._encode_batch([text])[0].tolist()
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of document chunks"""
+        return self._encode_batch(texts).tolist()
+    
     async def _process_python_file(self, file_path: str, documents):
         """Extract Python code structure and comments"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Reuse the text the loader already read instead of opening the file again
+            content = "".join(doc.page_content for doc in documents)
             
             # Parse Python AST to extract structure
             tree = ast.parse(content)
             
-            # Extract classes, functions, and their docstrings
-            code_structure = {
-                'classes': [],
-                'functions': [],
-                'imports': [],
-                'comments': self._extract_comments(content)
-            }
+            # Extract class (with method), function and import names
+            classes = []
+            functions = []
+            imports = []
             
-            for node in ast.walk(tree):
+            # Only top-level nodes: methods belong to their class, not the function list
+            for node in tree.body:
                 if isinstance(node, ast.ClassDef):
-                    code_structure['classes'].append({
-                        'name': node.name,
-                        'docstring': ast.get_docstring(node),
-                        'methods': [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
-                    })
-                elif isinstance(node, ast.FunctionDef):
-                    code_structure['functions'].append({
+                    classes.append({
                         'name': node.name,
-                        'docstring': ast.get_docstring(node),
-                        'args': [arg.arg for arg in node.args.args]
+                        'methods': [n.name for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
                     })
+                elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    functions.append(node.name)
                 elif isinstance(node, ast.Import):
-                    code_structure['imports'].extend([alias.name for alias in node.names])
+                    imports.extend([alias.name for alias in node.names])
                 elif isinstance(node, ast.ImportFrom):
                     module = node.module or ''
-                    code_structure['imports'].extend([f"{module}.{alias.name}" for alias in node.names])
-            
-            self.python_files[os.path.basename(file_path)] = {
-                'content': content,
-                'structure': code_structure,
+                    imports.extend([f"{module}.{alias.name}" for alias in node.names])
+            
+            # Keep only the summary generate_test_case feeds to the LLM
+            source = os.path.basename(file_path)
+            class_signatures = [f"{c['name']}({', '.join(c['methods'])})" for c in classes]
+            summary = (
+                f"\n\nPython file structure from {source}:\n"
+                f"Classes: {class_signatures}\n"
+                f"Functions: {functions}\n"
+                f"Key imports: {imports[:5]}\n"
+                f"Comments: {self._extract_comments(content)[:3]}\n"
+            )
+            self.python_files[source] = {
+                'summary': summary,
                 'path': file_path
             }
             
@@ -142,37 +406,30 @@ class RAGPipeline:
 
     def _extract_comments(self, content: str) -> List[str]:
         """Extract comments from Python code"""
-        comments = []
-        lines = content.split('\n')
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('#'):
-                comments.append(stripped)
-        return comments
+        try:
+            tokens = tokenize.generate_tokens(io.StringIO(content).readline)
+            return [tok.string for tok in tokens if tok.type == tokenize.COMMENT]
+        except (tokenize.TokenError, SyntaxError):
+            # Source that can't be tokenized: fall back to full-line comments
+            return [line for line in (raw.lstrip() for raw in content.splitlines()) if line.startswith('#')]
+    
     def _get_document_loader(self, file_path: str):
         """Get appropriate document loader based on file extension"""
-        file_extension = Path(file_path).suffix.lower()
-        
-        if file_extension == '.pdf':
-            return PyPDFLoader(file_path)
-        elif file_extension in ['.txt', '.md', '.py']:
-            return TextLoader(file_path)
-        elif file_extension in ['.docx', '.doc']:
-            return UnstructuredWordDocumentLoader(file_path)
-        else:
-            # Default to text loader
-            return TextLoader(file_path)
+        file_extension = os.path.splitext(file_path)[1].lower()
+        return LOADERS.get(file_extension, TextLoader)(file_path)
     
     async def process_query(self, query: str, context: Optional[str] = None) -> Dict[str, Any]:
         """Process query using RAG"""
         try:
             # Create query embedding
-            query_embedding = self.embeddings.embed_query(query)
+            query_embedding = await self._run_blocking(self.embed_query, query)
             
             # Search similar documents
-            results = self.collection.query(
+            results = await self._run_blocking(
+                self.collection.query,
                 query_embeddings=[query_embedding],
-                n_results=5
+                n_results=5,
+                include=["documents", "metadatas", "distances"]
             )
             
             # Extract relevant context
@@ -184,9 +441,9 @@ class RAGPipeline:
                 sources = [meta.get('source', 'Unknown') for meta in results['metadatas'][0]]
                 # Calculate accuracy based on similarity scores
                 if results.get('distances') and results['distances'][0]:
-                    # Convert distances to similarity scores (lower distance = higher similarity)
-                    similarities = [1 - dist for dist in results['distances'][0]]
-                    accuracy_score = max(similarities) * 100 if similarities else 0.0
+                    # Best similarity is 1 - smallest distance (lower distance = higher similarity)
+                    distances = np.asarray(results['distances'][0])
+                    accuracy_score = float((1.0 - distances.min()) * 100.0)
             
             # Build context for LLM
             context_text = "\n\n".join(retrieved_docs[:3])  # Use top 3 results
@@ -196,7 +453,7 @@ class RAGPipeline:
             
             return {
                 "answer": response,
-                "sources": list(set(sources)),
+                "sources": list(dict.fromkeys(sources)),
                 "context_used": len(retrieved_docs) > 0,
                 "accuracy_percentage": round(accuracy_score, 1)
             }
@@ -204,7 +461,7 @@ class RAGPipeline:
         except Exception as e:
             print(f"Error processing query: {e}")
             return {
-                "answer": "I apologize, but I encountered an error processing your request.",
+                "answer": QUERY_ERROR_ANSWER,
                 "sources": [],
                 "context_used": False,
                 "accuracy_percentage": 0.0
@@ -225,8 +482,8 @@ class RAGPipeline:
             """
             
             # Call LiteLLM proxy
-            response = requests.post(
-                f"{self.config.litellm_endpoint}/chat/completions",
+            response = await self.http.post(
+                "/chat/completions",
                 json={
                     "model": "gpt-3.5-turbo",
                     "messages": [
@@ -234,28 +491,29 @@ class RAGPipeline:
                     ],
                     "max_tokens": 500,
                     "temperature": 0.7
-                },
-                headers={"Content-Type": "application/json"}
+                }
             )
             
             if response.status_code == 200:
                 result = response.json()
                 return result['choices'][0]['message']['content']
             else:
-                return "I'm having trouble accessing the AI model right now. Please try again later."
+                return LLM_UNAVAILABLE_ANSWER
                 
         except Exception as e:
             print(f"Error generating response: {e}")
-            return "I encountered an error while generating a response."
+            return LLM_ERROR_ANSWER
     
     async def generate_test_case(self, description: str) -> str:
         """Generate test cases based on description"""
         try:
             # Search for relevant documentation
-            query_embedding = self.embeddings.embed_query(description)
-            results = self.collection.query(
+            query_embedding = await self._run_blocking(self.embed_query, description)
+            results = await self._run_blocking(
+                self.collection.query,
                 query_embeddings=[query_embedding],
-                n_results=3
+                n_results=3,
+                include=["documents", "metadatas", "distances"]
             )
             
             context = "\n\n".join(results['documents'][0]) if results['documents'] else ""
@@ -267,18 +525,13 @@ class RAGPipeline:
                     if metadata.get('file_type') == 'python':
                         source = metadata.get('source')
                         if source in self.python_files:
-                            python_info = self.python_files[source]
-                            python_context += f"\n\nPython file structure from {source}:\n"
-                            python_context += f"Classes: {[c['name'] for c in python_info['structure']['classes']]}\n"
-                            python_context += f"Functions: {[f['name'] for f in python_info['structure']['functions']]}\n"
-                            python_context += f"Key imports: {python_info['structure']['imports'][:5]}\n"
-                            python_context += f"Comments: {python_info['structure']['comments'][:3]}\n"
+                            python_context += self.python_files[source]['summary']
             
             # Calculate accuracy
             accuracy_score = 0.0
             if results.get('distances') and results['distances'][0]:
-                similarities = [1 - dist for dist in results['distances'][0]]
-                accuracy_score = max(similarities) * 100 if similarities else 0.0
+                distances = np.asarray(results['distances'][0])
+                accuracy_score = float((1.0 - distances.min()) * 100.0)
             
             prompt = f"""
             Based on the following documentation context and Python code examples, generate detailed test cases for: {description}
@@ -307,8 +560,8 @@ class RAGPipeline:
             Test Case:
             """
             
-            response = requests.post(
-                f"{self.config.litellm_endpoint}/chat/completions",
+            response = await self.http.post(
+                "/chat/completions",
                 json={
                     "model": "gpt-3.5-turbo",
                     "messages": [{"role": "user", "content": prompt}],
@@ -343,37 +596,46 @@ class RAGPipeline:
         """Execute generated Python test script"""
         try:
             # Create temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as temp_file:
-                temp_file.write(script_content)
+            async with aiofiles.tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as temp_file:
+                await temp_file.write(script_content)
                 temp_file_path = temp_file.name
             
-            # Execute the script
-            result = subprocess.run(
-                ['python', temp_file_path],
-                capture_output=True,
-                text=True,
-                timeout=30  # 30 second timeout
-            )
-            
-            # Clean up
-            os.unlink(temp_file_path)
+            # Execute the script without blocking the event loop
+            process = None
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable, temp_file_path,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=30)  # 30 second timeout
+                except asyncio.TimeoutError:
+                    return {
+                        "success": False,
+                        "stdout": "",
+                        "stderr": "Test execution timed out after 30 seconds",
+                        "return_code": -1,
+                        "execution_time": "30s (timeout)"
+                    }
+            finally:
+                # Never leave the script running, whether it timed out or we were cancelled
+                if process is not None and process.returncode is None:
+                    with suppress(ProcessLookupError):
+                        process.kill()
+                    await process.wait()
+                
+                # Clean up
+                await aiofiles.os.remove(temp_file_path)
             
             return {
-                "success": result.returncode == 0,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "return_code": result.returncode,
+                "success": process.returncode == 0,
+                "stdout": stdout.decode(errors="replace"),
+                "stderr": stderr.decode(errors="replace"),
+                "return_code": process.returncode,
                 "execution_time": "< 30s"
             }
             
-        except subprocess.TimeoutExpired:
-            return {
-                "success": False,
-                "stdout": "",
-                "stderr": "Test execution timed out after 30 seconds",
-                "return_code": -1,
-                "execution_time": "30s (timeout)"
-            }
         except Exception as e:
             return {
                 "success": False,
@@ -386,51 +648,49 @@ class RAGPipeline:
     async def list_documents(self) -> List[Dict[str, Any]]:
         """List all processed documents"""
         try:
-            # Get all unique sources from collection
-            all_data = self.collection.get()
-            sources = set()
-            
-            if all_data['metadatas']:
-                for metadata in all_data['metadatas']:
-                    if 'source' in metadata:
-                        sources.add(metadata['source'])
-            
-            documents = []
-            documents_dir = Path(self.config.documents_path)
-            
-            for source in sources:
-                file_path = documents_dir / source
-                if file_path.exists():
-                    stat = file_path.stat()
-                    documents.append({
-                        "filename": source,
-                        "size": stat.st_size,
-                        "type": file_path.suffix,
-                        "processed": True,
-                        "is_python": file_path.suffix == '.py'
-                    })
-            
+            documents = await self._run_blocking(self._stat_documents, list(self._known_sources))
             return documents
             
         except Exception as e:
             print(f"Error listing documents: {e}")
             return []
     
+    def _stat_documents(self, sources: List[str]) -> List[Dict[str, Any]]:
+        """Describe each indexed source that still exists in the documents directory"""
+        documents = []
+        documents_dir = Path(self.config.documents_path)
+        
+        for source in sources:
+            file_path = documents_dir / source
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+            documents.append({
+                "filename": source,
+                "size": stat.st_size,
+                "type": file_path.suffix,
+                "processed": True,
+                "is_python": file_path.suffix == '.py'
+            })
+        
+        return documents
+    
+    def _load_known_sources(self) -> Dict[str, None]:
+        """Collect the distinct source filenames from ChromaDB metadata"""
+        all_data = self.collection.get(include=["metadatas"])
+        return dict.fromkeys(
+            metadata['source']
+            for metadata in all_data['metadatas'] or []
+            if metadata and 'source' in metadata
+        )
+    
     async def delete_document(self, filename: str) -> bool:
         """Delete document from vector store and filesystem"""
         try:
-            # Get all document IDs for this file
-            all_data = self.collection.get()
-            ids_to_delete = []
-            
-            if all_data['metadatas']:
-                for i, metadata in enumerate(all_data['metadatas']):
-                    if metadata.get('source') == filename:
-                        ids_to_delete.append(all_data['ids'][i])
-            
-            # Delete from ChromaDB
-            if ids_to_delete:
-                self.collection.delete(ids=ids_to_delete)
+            # Delete this file's chunks from ChromaDB with a metadata filter
+            await self._run_blocking(self.collection.delete, where={"source": filename})
+            self._known_sources.pop(filename, None)
             
             # Remove from Python files cache
             if filename in self.python_files:
@@ -438,8 +698,7 @@ class RAGPipeline:
             
             # Delete file from filesystem
             file_path = Path(self.config.documents_path) / filename
-            if file_path.exists():
-                file_path.unlink()
+            await self._run_blocking(file_path.unlink, missing_ok=True)
             
             return True
             